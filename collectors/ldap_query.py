@@ -6,9 +6,10 @@ LDAP RADIUS MAC 查詢模組
 """
 
 import subprocess
-import re
+import signal
+import threading
 from pathlib import Path
-from typing import List, Optional
+from typing import Iterator, List, Optional, Set
 import logging
 
 import sys
@@ -17,9 +18,16 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from utils import uid_to_mac, is_valid_mac, ensure_dir
 
 
+class LDAPSearchError(Exception):
+    """ldapsearch 執行失敗"""
+
+
 class LDAPQuery:
     """LDAP RADIUS MAC 查詢器"""
     
+    # ldapsearch 逾時秒數
+    LDAPSEARCH_TIMEOUT = 60
+    
     def __init__(
         self,
         server: str,
@@ -44,12 +52,15 @@ class LDAPQuery:
         self.base_dn = base_dn
         self.logger = logger or logging.getLogger(__name__)
     
-    def _run_ldapsearch(self) -> Optional[str]:
+    def _iter_uids(self) -> Iterator[str]:
         """
-        執行 ldapsearch 命令
+        執行 ldapsearch 命令，逐行串流輸出並產生 UID
         
-        Returns:
-            命令輸出，若失敗則返回 None
+        Yields:
+            UID 字串
+        
+        Raises:
+            LDAPSearchError: ldapsearch 執行失敗或逾時
         """
         command = [
             'ldapsearch',
@@ -59,45 +70,42 @@ class LDAPQuery:
             '-D', self.bind_dn,
             '-w', self.password,
             '-b', self.base_dn,
-            'uid=*'
+            '-LLL',                 # 不輸出註解與版本資訊
+            '-o', 'ldif-wrap=no',   # 不折行
+            'uid=*',
+            'uid'                   # 只取回 uid 屬性
         ]
         
         try:
-            result = subprocess.run(
+            process = subprocess.Popen(
                 command,
-                capture_output=True,
-                text=True,
-                timeout=60
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                bufsize=1 << 20
             )
-            
-            if result.returncode != 0:
-                self.logger.error(f"ldapsearch 失敗: {result.stderr}")
-                return None
-            
-            return result.stdout
-            
-        except subprocess.TimeoutExpired:
-            self.logger.error("ldapsearch 執行逾時")
-            return None
         except FileNotFoundError:
-            self.logger.error("找不到 ldapsearch 命令，請確認已安裝 ldap-utils")
-            return None
+            raise LDAPSearchError("找不到 ldapsearch 命令，請確認已安裝 ldap-utils")
         except Exception as e:
-            self.logger.error(f"執行錯誤: {e}")
-            return None
-    
-    def _parse_uids(self, ldap_output: str) -> List[str]:
-        """
-        從 LDAP 輸出中提取 UID
+            raise LDAPSearchError(f"執行錯誤: {e}")
         
-        Args:
-            ldap_output: ldapsearch 的輸出
-        
-        Returns:
-            UID 清單
-        """
-        uids = re.findall(r'uid:\s*(\S+)', ldap_output)
-        return uids
+        # 逾時則強制結束 ldapsearch，讀取迴圈會隨之結束
+        timer = threading.Timer(self.LDAPSEARCH_TIMEOUT, process.kill)
+        timer.start()
+        try:
+            with process:
+                for line in process.stdout:
+                    if line.startswith(b'uid:'):
+                        yield line[4:].strip().decode('utf-8', errors='replace')
+                stderr = process.stderr.read()
+        finally:
+            timer.cancel()
+        
+        if process.returncode == -signal.SIGKILL:
+            raise LDAPSearchError("ldapsearch 執行逾時")
+        if process.returncode != 0:
+            raise LDAPSearchError(
+                f"ldapsearch 失敗: {stderr.decode('utf-8', errors='replace')}"
+            )
     
     def query(self) -> List[str]:
         """
@@ -108,30 +116,31 @@ class LDAPQuery:
         """
         self.logger.info(f"連線至 LDAP: {self.server}")
         
-        ldap_output = self._run_ldapsearch()
-        if not ldap_output:
+        valid_macs: Set[str] = set()
+        uid_count = 0
+        invalid_count = 0
+        
+        try:
+            for uid in self._iter_uids():
+                uid_count += 1
+                mac = uid_to_mac(uid)
+                if is_valid_mac(mac):
+                    valid_macs.add(mac)
+                else:
+                    invalid_count += 1
+                    self.logger.debug(f"無效的 MAC 格式: {uid} -> {mac}")
+        except LDAPSearchError as e:
+            self.logger.error(str(e))
             self.logger.error("無法取得 LDAP 資料")
             return []
         
-        uids = self._parse_uids(ldap_output)
-        self.logger.info(f"找到 {len(uids)} 個 UID")
-        
-        valid_macs = []
-        invalid_count = 0
-        
-        for uid in uids:
-            mac = uid_to_mac(uid)
-            if is_valid_mac(mac):
-                valid_macs.append(mac)
-            else:
-                invalid_count += 1
-                self.logger.debug(f"無效的 MAC 格式: {uid} -> {mac}")
+        self.logger.info(f"找到 {uid_count} 個 UID")
         
         if invalid_count > 0:
             self.logger.warning(f"過濾掉 {invalid_count} 個無效的 MAC 格式")
         
-        # 排序並去重
-        sorted_macs = sorted(set(valid_macs))
+        # 排序（已於讀取時去重）
+        sorted_macs = sorted(valid_macs)
         self.logger.info(f"有效 MAC 數量: {len(sorted_macs)}")
         
         return sorted_macs
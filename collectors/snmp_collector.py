@@ -5,18 +5,20 @@ SNMP ARP 表收集器
 重構自 GetMAC_V6.py
 """
 
-import subprocess
+import asyncio
 import re
 import csv
 from datetime import datetime
+from itertools import chain
+from operator import itemgetter
 from pathlib import Path
-from typing import List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional
 import logging
 
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from utils import is_zero_mac, normalize_mac, ensure_dir
+from utils import is_zero_mac_bytes, ensure_dir
 
 
 class SNMPCollector:
@@ -25,11 +27,27 @@ class SNMPCollector:
     # ARP 表 OID (ipNetToMediaPhysAddress)
     DEFAULT_OID = "1.3.6.1.2.1.4.22.1.2"
     
+    # 匹配格式：iso.3.6.1.2.1.4.22.1.2.{介面}.{IP} = Hex-STRING: XX XX XX XX XX XX
+    # 直接比對 snmpwalk 的原始 bytes 輸出，不先解碼為字串
+    ARP_PATTERN = re.compile(
+        rb"iso\.3\.6\.1\.2\.1\.4\.22\.1\.2\.\d+\.(\d+\.\d+\.\d+\.\d+) = Hex-STRING: ([0-9A-Fa-f]{2}(?: [0-9A-Fa-f]{2}){5})"
+    )
+    
+    # 同時掃描的設備數量上限
+    DEFAULT_CONCURRENCY = 32
+    
+    # snmpbulkwalk 每個 GETBULK 請求取回的筆數
+    BULK_MAX_REPETITIONS = 25
+    
+    # 單次 snmpwalk 逾時秒數
+    SNMPWALK_TIMEOUT = 30
+    
     def __init__(
         self,
         communities: List[str],
         device_ips: List[str],
         oid: str = DEFAULT_OID,
+        concurrency: int = DEFAULT_CONCURRENCY,
         logger: Optional[logging.Logger] = None
     ):
         """
@@ -39,16 +57,63 @@ class SNMPCollector:
             communities: SNMP community strings 清單
             device_ips: 要掃描的設備 IP 清單
             oid: SNMP OID（預設為 ARP 表）
+            concurrency: 同時掃描的設備數量上限
             logger: Logger 物件
         """
         self.communities = communities
         self.device_ips = device_ips
         self.oid = oid
+        self.concurrency = max(1, concurrency)
         self.logger = logger or logging.getLogger(__name__)
     
-    def _run_snmpwalk(self, device_ip: str) -> Optional[str]:
+    async def _walk_community(self, device_ip: str, community: str) -> Optional[bytes]:
         """
-        對單一設備執行 snmpwalk，依序嘗試不同的 community
+        以單一 community 對設備執行 snmpbulkwalk
+        
+        Args:
+            device_ip: 設備 IP
+            community: SNMP community string
+        
+        Returns:
+            SNMP 輸出，若無回應或逾時則返回 None
+        """
+        # 使用 GETBULK，每次請求取回多筆，減少與設備間的往返次數
+        command = [
+            'snmpbulkwalk', '-v', '2c', '-c', community,
+            f'-Cr{self.BULK_MAX_REPETITIONS}',
+            device_ip, self.oid
+        ]
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        try:
+            stdout, _ = await asyncio.wait_for(
+                process.communicate(),
+                timeout=self.SNMPWALK_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            self.logger.warning(f"{device_ip}: community '{community}' 逾時")
+            return None
+        except asyncio.CancelledError:
+            # 其他 community 已成功，結束此 snmpwalk
+            process.kill()
+            await process.wait()
+            raise
+        
+        if stdout:
+            self.logger.debug(f"{device_ip}: 使用 community '{community}' 成功")
+            return stdout
+        
+        self.logger.debug(f"{device_ip}: community '{community}' 無回應")
+        return None
+    
+    async def _run_snmpwalk(self, device_ip: str) -> Optional[bytes]:
+        """
+        對單一設備執行 snmpwalk，同時嘗試所有 community，採用最先成功的結果
         
         Args:
             device_ip: 設備 IP
@@ -56,56 +121,88 @@ class SNMPCollector:
         Returns:
             SNMP 輸出，若全部失敗則返回 None
         """
-        for community in self.communities:
-            command = ['snmpwalk', '-v', '2c', '-c', community, device_ip, self.oid]
-            try:
-                result = subprocess.run(
-                    command,
-                    capture_output=True,
-                    text=True,
-                    timeout=30
+        pending = {
+            asyncio.create_task(self._walk_community(device_ip, community))
+            for community in self.communities
+        }
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending,
+                    return_when=asyncio.FIRST_COMPLETED
                 )
-                if result.stdout:
-                    self.logger.debug(f"{device_ip}: 使用 community '{community}' 成功")
-                    return result.stdout
-                else:
-                    self.logger.debug(f"{device_ip}: community '{community}' 無回應")
-            except subprocess.TimeoutExpired:
-                self.logger.warning(f"{device_ip}: community '{community}' 逾時")
-            except Exception as e:
-                self.logger.error(f"{device_ip}: 執行錯誤 - {e}")
+                for task in done:
+                    try:
+                        snmp_output = task.result()
+                    except Exception as e:
+                        self.logger.error(f"{device_ip}: 執行錯誤 - {e}")
+                        continue
+                    if snmp_output:
+                        return snmp_output
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
         
         self.logger.warning(f"{device_ip}: 所有 community 都無法取得資料")
         return None
     
-    def _parse_snmp_output(self, snmp_output: str) -> List[Tuple[str, str]]:
+    def _parse_snmp_output(self, snmp_output: bytes) -> List[Tuple[str, str]]:
         """
         解析 SNMP 輸出，提取 IP-MAC 對應
         
         Args:
-            snmp_output: snmpwalk 的輸出
+            snmp_output: snmpwalk 的原始輸出
         
         Returns:
             [(IP, MAC), ...] 清單
         """
-        # 匹配格式：iso.3.6.1.2.1.4.22.1.2.{介面}.{IP} = Hex-STRING: XX XX XX XX XX XX
-        pattern = re.compile(
-            r"iso\.3\.6\.1\.2\.1\.4\.22\.1\.2\.(\d+)\.(\d+\.\d+\.\d+\.\d+)\s*=\s*Hex-STRING:\s*(([0-9A-F]{2}\s*){5}[0-9A-F]{2})",
-            re.IGNORECASE
-        )
-        
         results = []
-        for match in pattern.finditer(snmp_output):
-            ip = match.group(2)
-            mac_raw = match.group(3).strip()
-            mac = normalize_mac(mac_raw.replace(" ", ":"))
+        for match in self.ARP_PATTERN.finditer(snmp_output):
+            ip = match.group(1).decode('ascii')
+            # Hex-STRING 直接轉為 6 bytes，不再經過字串標準化
+            mac_bytes = bytes.fromhex(match.group(2).decode('ascii'))
             
             # 過濾全零 MAC
-            if not is_zero_mac(mac):
-                results.append((ip, mac))
+            if not is_zero_mac_bytes(mac_bytes):
+                results.append((ip, mac_bytes.hex(':')))
         
         return results
     
+    async def _scan_device(
+        self,
+        device_ip: str,
+        semaphore: asyncio.Semaphore
+    ) -> List[Tuple[str, str]]:
+        """
+        掃描單一設備的 ARP 表
+        
+        Args:
+            device_ip: 設備 IP
+            semaphore: 限制同時掃描數量的 Semaphore
+        
+        Returns:
+            [(IP, MAC), ...] 清單
+        """
+        async with semaphore:
+            self.logger.info(f"掃描設備: {device_ip}")
+            snmp_output = await self._run_snmpwalk(device_ip)
+        
+        if not snmp_output:
+            self.logger.warning(f"{device_ip}: 無法取得資料")
+            return []
+        
+        records = self._parse_snmp_output(snmp_output)
+        self.logger.info(f"{device_ip}: 找到 {len(records)} 筆 IP-MAC 記錄")
+        return records
+    
+    async def _collect_async(self) -> List[List[Tuple[str, str]]]:
+        """同時掃描所有設備，返回各設備的記錄清單"""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        return await asyncio.gather(
+            *[self._scan_device(device_ip, semaphore) for device_ip in self.device_ips]
+        )
+    
     def collect(self) -> List[Tuple[str, str]]:
         """
         收集所有設備的 ARP 表
@@ -113,21 +210,15 @@ class SNMPCollector:
         Returns:
             去重排序後的 [(IP, MAC), ...] 清單
         """
-        all_records: List[Tuple[str, str]] = []
+        device_records = asyncio.run(self._collect_async())
         
-        for device_ip in self.device_ips:
-            self.logger.info(f"掃描設備: {device_ip}")
-            snmp_output = self._run_snmpwalk(device_ip)
-            
-            if snmp_output:
-                records = self._parse_snmp_output(snmp_output)
-                self.logger.info(f"{device_ip}: 找到 {len(records)} 筆 IP-MAC 記錄")
-                all_records.extend(records)
-            else:
-                self.logger.warning(f"{device_ip}: 無法取得資料")
-        
-        # 去重並排序
-        unique_records = sorted(set(all_records), key=lambda x: x[0])
+        # 各設備結果直接以 dict 去重（保留順序），不另建合併清單
+        unique: Dict[Tuple[str, str], None] = dict.fromkeys(
+            chain.from_iterable(device_records)
+        )
+        
+        # 依 IP 排序
+        unique_records = sorted(unique, key=itemgetter(0))
         self.logger.info(f"總計: {len(unique_records)} 筆唯一記錄")
         
         return unique_records
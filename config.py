@@ -9,6 +9,12 @@ import yaml
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 
+# 優先使用 libyaml 的 C 實作，未安裝時退回純 Python 版本
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
 
 class Config:
     """設定管理類別"""
@@ -17,6 +23,7 @@ class Config:
         'snmp': {
             'communities': ['public'],
             'oid': '1.3.6.1.2.1.4.22.1.2',
+            'concurrency': 32,
             'device_ips': []
         },
         'ldap': {
@@ -60,7 +67,7 @@ class Config:
     def _load_from_file(self, config_path: Path) -> None:
         """從 YAML 檔案載入設定"""
         with open(config_path, 'r', encoding='utf-8') as f:
-            file_config = yaml.safe_load(f)
+            file_config = yaml.load(f, Loader=_YamlLoader)
             if file_config:
                 self._merge_config(file_config)
     
@@ -81,6 +88,10 @@ class Config:
     def snmp_oid(self) -> str:
         return self._config['snmp']['oid']
     
+    @property
+    def snmp_concurrency(self) -> int:
+        return int(self._config['snmp']['concurrency'])
+    
     @property
     def snmp_device_ips(self) -> List[str]:
         return self._config['snmp']['device_ips']
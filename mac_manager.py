@@ -50,6 +50,7 @@ def cmd_collect_arp(args, config, logger):
         communities=config.snmp_communities,
         device_ips=device_ips,
         oid=config.snmp_oid,
+        concurrency=config.snmp_concurrency,
         logger=logger
     )
     
@@ -156,14 +157,13 @@ def cmd_compare(args, config, logger):
         logger.error(f"LDAP 檔案不存在: {ldap_file}")
         return 1
     
-    # 解析 ARP 檔案（CSV 格式）
+    # 解析 ARP 檔案（CSV 格式：IP,MAC,Date，欄位不含逗號與引號，直接切割）
     arp_macs: Set[str] = set()
-    import csv
-    with open(arp_file, 'r', encoding='utf-8') as f:
-        reader = csv.reader(f)
-        for row in reader:
-            if len(row) >= 2 and row[0].lower() != 'ip':
-                arp_macs.add(row[1].lower())
+    with open(arp_file, 'rb') as f:
+        for line in f:
+            fields = line.split(b',', 2)
+            if len(fields) >= 2 and fields[0].lower() != b'ip':
+                arp_macs.add(fields[1].strip().lower().decode('utf-8'))
     
     # 解析 LDAP 檔案（每行一個 MAC）
     ldap_macs: Set[str] = set()
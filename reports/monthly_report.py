@@ -5,11 +5,10 @@
 重構自 MonthReportV3.py
 """
 
-import csv
-import glob
-from datetime import datetime
+import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Tuple, Optional
+from typing import Dict, Iterable, Iterator, List, Set, Tuple, Optional
 import logging
 
 import sys
@@ -18,6 +17,80 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from utils import ensure_dir
 
 
+# {MAC: (IP, 日期)}
+LatestRecords = Dict[str, Tuple[str, str]]
+
+
+def _is_iso_date(date_str: str) -> bool:
+    """檢查是否為 YYYY-MM-DD 格式的日期字串"""
+    return (
+        len(date_str) == 10
+        and date_str[4] == '-'
+        and date_str[7] == '-'
+        and (date_str[:4] + date_str[5:7] + date_str[8:]).isdigit()
+    )
+
+
+def _read_csv(file_path: Path) -> Iterator[Tuple[str, str, str]]:
+    """
+    逐筆讀取單一 CSV 檔案
+    
+    Args:
+        file_path: CSV 檔案路徑
+    
+    Yields:
+        (IP, MAC, 日期)
+    """
+    # 每日檔案不大，一次讀入並整體解碼，省去逐行、逐欄位的解碼
+    with open(file_path, 'rb') as f:
+        content = f.read().decode('utf-8')
+    
+    for line in content.splitlines():
+        # 欄位不含逗號與引號，直接切割，不經過 csv 模組
+        fields = line.split(',')
+        # 跳過 header 或空行
+        if len(fields) < 3:
+            continue
+        if fields[0].lower() == 'ip':  # 跳過 header
+            continue
+        # 過濾全零 MAC
+        if fields[1] != "00:00:00:00:00:00":
+            yield (fields[0], fields[1], fields[2])
+
+
+def _parse_daily_csv(file_path: Path) -> Tuple[LatestRecords, int, List[str]]:
+    """
+    讀取單一每日 CSV，每個 MAC 只保留最新日期的記錄
+    
+    於 ProcessPoolExecutor 子行程中執行，因此不直接寫日誌，
+    改為將筆數與無效日期回傳給主行程。
+    
+    Args:
+        file_path: CSV 檔案路徑
+    
+    Returns:
+        ({MAC: (IP, 日期)}, 讀取筆數, 無效日期清單)
+    """
+    # 日期為 YYYY-MM-DD，字串比較即等同日期比較
+    latest_records: LatestRecords = {}
+    valid_dates: Set[str] = set()
+    invalid_dates: List[str] = []
+    record_count = 0
+    
+    for ip, mac, date_str in _read_csv(file_path):
+        record_count += 1
+        if date_str not in valid_dates:
+            if not _is_iso_date(date_str):
+                invalid_dates.append(date_str)
+                continue
+            valid_dates.add(date_str)
+        
+        if mac not in latest_records or date_str > latest_records[mac][1]:
+            latest_records[mac] = (ip, date_str)
+    
+    return latest_records, record_count, invalid_dates
+
+
 class MonthlyReportGenerator:
     """月報表產生器"""
     
@@ -39,59 +112,30 @@ class MonthlyReportGenerator:
         self.output_dir = Path(output_dir)
         self.logger = logger or logging.getLogger(__name__)
     
-    def _read_csv(self, file_path: Path) -> List[Tuple[str, str, str]]:
-        """
-        讀取單一 CSV 檔案
-        
-        Args:
-            file_path: CSV 檔案路徑
-        
-        Returns:
-            [(IP, MAC, 日期), ...] 清單
-        """
-        records = []
-        with open(file_path, 'r', newline='', encoding='utf-8') as f:
-            reader = csv.reader(f)
-            for row in reader:
-                # 跳過 header 或空行
-                if len(row) < 3:
-                    continue
-                if row[0].lower() == 'ip':  # 跳過 header
-                    continue
-                # 過濾全零 MAC
-                if row[1] != "00:00:00:00:00:00":
-                    records.append((row[0], row[1], row[2]))
-        return records
-    
     def _filter_latest_mac(
         self,
-        records: List[Tuple[str, str, str]]
+        partials: Iterable[LatestRecords]
     ) -> List[Tuple[str, str, str]]:
         """
-        過濾每個 MAC 只保留最新日期的記錄
+        合併各檔案的結果，每個 MAC 只保留最新日期的記錄
         
         Args:
-            records: [(IP, MAC, 日期), ...] 清單
+            partials: 各檔案的 {MAC: (IP, 日期)}，依檔案順序
         
         Returns:
-            過濾後的記錄清單
+            過濾後的 [(IP, MAC, 日期), ...] 清單
         """
-        latest_records = {}  # {MAC: (IP, date_obj)}
+        latest_records: LatestRecords = {}
         
-        for ip, mac, date_str in records:
-            try:
-                date_obj = datetime.strptime(date_str, "%Y-%m-%d")
-            except ValueError:
-                self.logger.warning(f"無效的日期格式: {date_str}")
-                continue
-            
-            if mac not in latest_records or date_obj > latest_records[mac][1]:
-                latest_records[mac] = (ip, date_obj)
+        for partial in partials:
+            for mac, record in partial.items():
+                if mac not in latest_records or record[1] > latest_records[mac][1]:
+                    latest_records[mac] = record
         
         # 轉換回 (IP, MAC, 日期) 格式
         result = [
-            (ip, mac, date_obj.strftime("%Y-%m-%d"))
-            for mac, (ip, date_obj) in latest_records.items()
+            (ip, mac, date_str)
+            for mac, (ip, date_str) in latest_records.items()
         ]
         
         return result
@@ -114,27 +158,32 @@ class MonthlyReportGenerator:
             輸出檔案路徑，若無資料則返回 None
         """
         # 搜尋該月份的所有 CSV 檔案
-        pattern = str(self.input_dir / f"mac_addresses_{year}{month:02}*.csv")
-        files = glob.glob(pattern)
+        pattern = f"mac_addresses_{year}{month:02}*.csv"
+        file_paths = sorted(self.input_dir.glob(pattern))
         
-        if not files:
+        if not file_paths:
             self.logger.warning(f"找不到 {year}/{month:02} 的資料檔案")
-            self.logger.debug(f"搜尋路徑: {pattern}")
+            self.logger.debug(f"搜尋路徑: {self.input_dir / pattern}")
             return None
         
-        self.logger.info(f"找到 {len(files)} 個檔案")
+        self.logger.info(f"找到 {len(file_paths)} 個檔案")
         
-        # 讀取所有檔案
-        all_records = []
-        for file_path in files:
-            records = self._read_csv(Path(file_path))
-            self.logger.debug(f"{file_path}: {len(records)} 筆記錄")
-            all_records.extend(records)
+        # 各檔案於子行程平行解析，再依檔案順序合併
+        partials = []
+        record_count = 0
+        workers = min(len(file_paths), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(_parse_daily_csv, file_paths)
+            for file_path, (partial, count, invalid_dates) in zip(file_paths, results):
+                self.logger.debug(f"{file_path}: {count} 筆記錄")
+                for date_str in invalid_dates:
+                    self.logger.warning(f"無效的日期格式: {date_str}")
+                record_count += count
+                partials.append(partial)
         
-        self.logger.info(f"總計讀取 {len(all_records)} 筆記錄")
+        self.logger.info(f"總計讀取 {record_count} 筆記錄")
         
-        # 過濾最新記錄
-        filtered_records = self._filter_latest_mac(all_records)
+        filtered_records = self._filter_latest_mac(partials)
         self.logger.info(f"過濾後: {len(filtered_records)} 個唯一 MAC")
         
         # 排序（按 MAC 和日期）
@@ -144,12 +193,13 @@ class MonthlyReportGenerator:
         ensure_dir(self.output_dir)
         output_file = self.output_dir / f"Result{year}{month:02}.csv"
         
-        with open(output_file, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
+        # 欄位不含逗號與引號，不需 csv 模組的跳脫處理；沿用 csv 預設的 \r\n 換行
+        lines = [f"{ip},{mac},{date}\r\n" for ip, mac, date in sorted_records]
+        
+        with open(output_file, 'w', newline='', encoding='utf-8', buffering=1 << 20) as f:
             if include_header:
-                writer.writerow(['IP', 'MAC', 'Last_Seen'])
-            for ip, mac, date in sorted_records:
-                writer.writerow([ip, mac, date])
+                f.write("IP,MAC,Last_Seen\r\n")
+            f.writelines(lines)
         
         self.logger.info(f"月報表已儲存至: {output_file}")
         return output_file
@@ -5,11 +5,22 @@
 """
 
 import re
+import string
 import logging
 from typing import Optional
 from pathlib import Path
 
 
+# MAC 地址格式（XX:XX:XX:XX:XX:XX）
+_MAC_RE = re.compile(r"[0-9A-Fa-f]{2}(?::[0-9A-Fa-f]{2}){5}")
+
+# 全零 MAC 的原始 bytes
+_ZERO_MAC_BYTES = b'\x00' * 6
+
+# 刪除 MAC 中的分隔符與空白（所有 ASCII 非英數字元）
+_MAC_DELETE_TABLE = str.maketrans('', '', string.punctuation + string.whitespace)
+
+
 def is_valid_mac(mac: str) -> bool:
     """
     驗證 MAC 地址格式是否正確
@@ -20,8 +31,8 @@ def is_valid_mac(mac: str) -> bool:
     Returns:
         是否為有效的 MAC 地址
     """
-    pattern = r"^([0-9A-Fa-f]{2}:){5}([0-9A-Fa-f]{2})$"
-    return re.match(pattern, mac) is not None
+    # 長度不符者直接排除，不進入 regex
+    return len(mac) == 17 and _MAC_RE.fullmatch(mac) is not None
 
 
 def normalize_mac(mac: str) -> str:
@@ -34,15 +45,18 @@ def normalize_mac(mac: str) -> str:
     Returns:
         標準化的 MAC 地址（小寫，冒號分隔）
     """
-    # 移除所有非十六進位字元
-    mac_clean = ''.join(filter(lambda c: c.isalnum(), mac))
+    # 移除所有分隔符
+    mac_clean = mac.translate(_MAC_DELETE_TABLE)
     
     if len(mac_clean) != 12:
         return mac  # 無法標準化，返回原值
     
     # 轉換為小寫並用冒號分隔
-    mac_normalized = ':'.join(mac_clean[i:i+2] for i in range(0, 12, 2))
-    return mac_normalized.lower()
+    mac_clean = mac_clean.lower()
+    return '%s:%s:%s:%s:%s:%s' % (
+        mac_clean[0:2], mac_clean[2:4], mac_clean[4:6],
+        mac_clean[6:8], mac_clean[8:10], mac_clean[10:12]
+    )
 
 
 def uid_to_mac(uid: str) -> str:
@@ -55,7 +69,7 @@ def uid_to_mac(uid: str) -> str:
     Returns:
         MAC 地址格式（XX:XX:XX:XX:XX:XX）
     """
-    uid_clean = ''.join(filter(str.isalnum, uid))
+    uid_clean = uid.translate(_MAC_DELETE_TABLE)
     mac = ':'.join(uid_clean[i:i+2] for i in range(0, len(uid_clean), 2))
     return mac.lower()
 
@@ -74,6 +88,19 @@ def is_zero_mac(mac: str) -> bool:
     return normalized == "00:00:00:00:00:00"
 
 
+def is_zero_mac_bytes(mac_bytes: bytes) -> bool:
+    """
+    檢查原始 bytes 形式的 MAC 地址是否全為零
+    
+    Args:
+        mac_bytes: MAC 地址的 6 bytes（如 SNMP Hex-STRING 解碼結果）
+    
+    Returns:
+        是否為 00:00:00:00:00:00
+    """
+    return mac_bytes == _ZERO_MAC_BYTES
+
+
 def setup_logging(
     level: str = "INFO",
     log_file: Optional[str] = None,